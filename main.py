@@ -1,12 +1,19 @@
 import os
+import ast
+import logging
+import sys
+import functools
+import heapq
 import json
+import operator
 import re
 import random
 import asyncio
 import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
 from urllib.parse import quote
-from typing import Dict, List, Optional, Union, Any, Tuple
+from typing import Dict, List, NamedTuple, Optional, Set, Union, Any, Tuple
 import aiofiles
 import aiofiles.os as aos
 from pathlib import Path
@@ -18,133 +25,300 @@ try:
 except ImportError:
     SIMPLEEVAL_AVAILABLE = False
 
+# 多模式字符串匹配库（可选，加速模糊匹配）
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# 高性能JSON库（可选）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from astrbot.api.event import filter, AstrMessageEvent, MessageEventResult
 from astrbot.api.star import Context, Star, register, StarTools
 from astrbot.api import logger
 from astrbot.api.message_components import *
 from astrbot.api import AstrBotConfig
 
+# 响应文本替换用的预编译正则
+# 通配符填充与用户变量合并为一个交替正则，响应文本只扫描一次
+_PLACEHOLDER_RE = re.compile(r'\[(?:n\.([1-5])(\.t)?|(qq|group|name|card|ai|id|消息id))\]')
+_RAND_RE = re.compile(r'\((\d+)-(\d+)\)')
+_TIME_RE = re.compile(r'\(([YMDhms])\)')
+
+# 时间变量字符串按秒缓存（插件运行在单事件循环中，无需加锁）
+_time_str_cache: Tuple[int, Dict[str, str]] = (-1, {})
+
+
+def _time_strings() -> Dict[str, str]:
+    """返回当前时间各字段的字符串，同一秒内复用缓存"""
+    global _time_str_cache
+    now_sec = int(time.time())
+    if _time_str_cache[0] != now_sec:
+        now = datetime.now()
+        _time_str_cache = (now_sec, {
+            'Y': str(now.year), 'M': str(now.month), 'D': str(now.day),
+            'h': str(now.hour), 'm': str(now.minute), 's': str(now.second),
+        })
+    return _time_str_cache[1]
+_EXPR_RE = re.compile(r'\(\+([^\)]+)\)')
+_MATCH_CLEAN_RE = re.compile(r'[\d\w/.:?=&-]+')
+_CMD_RE = re.compile(r'\[([^\[\]]+)\]')
+_COOLING_RE = re.compile(r'\((\d+)~\)')
+# 词条模式 -> 展示名
+_MODE_STR = {0: "模糊", 1: "精准", 10: "管理"}
+# 教词容错：全角符号 -> 半角符号
+_FULLWIDTH_TABLE = str.maketrans({
+    '【': '[', '】': ']', '（': '(', '）': ')',
+    '｛': '{', '｝': '}', '：': ':',
+})
+# 管理员带参指令：命令词 + 空格 + 参数，单次匹配替代逐个startswith
+_ADMIN_CMD_RE = re.compile(r'^(精准问答|模糊问答|加选项|删词|查词|切换词库) (.*)$', re.S)
+# 管理指令前缀预筛：非指令消息一次C层比较即出局
+_ADMIN_PREFIXES = ("精准问答 ", "模糊问答 ", "加选项 ", "删词 ", "查词 ",
+                   "切换词库 ", "词库清空", "词库备份")
+_COND_RE = re.compile(r'\{(.*?)([><=])(.*?)\}')
+_WILD_PH_RE = re.compile(r'\[n\.(\d+)\]')
+_WILD_ESC_RE = re.compile(r'\\\[n\\\.(\d+)\\\]')
+
+
+@functools.lru_cache(maxsize=2048)
+def _compile_wildcard(pattern: str) -> Optional[Tuple[re.Pattern, Tuple[int, ...]]]:
+    """编译通配符词条为正则（LRU缓存，每个词条只编译一次）
+
+    返回 (编译后的正则, 占位符索引)；编译失败返回None（None同样
+    被缓存，坏词条不会反复重编译）。
+    """
+    # 转义特殊字符，再将 [n.x] 替换为 (.+?)
+    safe_pattern = _WILD_ESC_RE.sub(r'(.+?)', re.escape(pattern))
+
+    try:
+        compiled = re.compile(f"^{safe_pattern}$")
+    except re.error as e:
+        logger.error(f"通配符词条编译失败: {pattern}, 错误: {e}")
+        return None
+
+    placeholders = tuple(int(x) for x in _WILD_PH_RE.findall(pattern))
+    return compiled, placeholders
+
+
+def _json_loads(content: Union[str, bytes]) -> Any:
+    """JSON反序列化（优先orjson）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps(data: Any) -> str:
+    """紧凑JSON序列化（优先orjson，不做缩进——这些文件不靠人工编辑）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+# k=v 配置行（switch.txt/select.txt），多行模式一次findall
+_KV_RE = re.compile(r'^\s*([^=\s]+)\s*=\s*(.*?)\s*$', re.M)
+
+
+def _parse_kv(path) -> Dict[str, str]:
+    """读取 k=v 行格式的配置文件（文件不存在返回空dict）"""
+    try:
+        content = Path(path).read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return {}
+
+    return dict(_KV_RE.findall(content))
+
+
+def _format_kv(data: Dict[str, str]) -> str:
+    """将dict序列化为 k=v 行格式（_parse_kv 的逆操作）"""
+    return '\n'.join(f"{k}={v}" for k, v in data.items())
+
+
+def _read_text(path) -> str:
+    """同步读取小文件（配合 asyncio.to_thread 使用，单次线程跳转）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _write_text(path, content: str):
+    """同步写入小文件（配合 asyncio.to_thread 使用）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _append_text(path, content: str):
+    """同步追加小文件（配合 asyncio.to_thread 使用）"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _seconds_until_midnight() -> int:
+    """距次日零点的秒数（(0~) 冷却语义：冷却到当天结束）"""
+    now = datetime.now()
+    tomorrow_midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(tomorrow_midnight.timestamp() - now.timestamp())
+
+
+def _write_text_atomic(path, content: str):
+    """先写临时文件再原子替换，避免读到写了一半的文件"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+async def _copy_file(src_path, dst_path, chunk_size: int = 65536):
+    """分块异步复制文件（内存占用与文件大小无关）"""
+    async with aiofiles.open(src_path, 'rb') as src:
+        async with aiofiles.open(dst_path, 'wb') as dst:
+            while chunk := await src.read(chunk_size):
+                await dst.write(chunk)
+
+
+# 模糊词条三连字布隆位图参数（大整数位图，内置hash，进程内构建和查询）
+_BLOOM_MASK = (1 << 14) - 1
+
+
+def _bloom_add(bloom: int, key: str) -> int:
+    """把字符串的所有三连字加入布隆位图（每个三连字置两个位）"""
+    for i in range(len(key) - 2):
+        h = hash(key[i:i + 3])
+        bloom |= (1 << (h & _BLOOM_MASK)) | (1 << ((h >> 17) & _BLOOM_MASK))
+    return bloom
+
+
+def _bloom_maybe_contains(bloom: int, text: str) -> bool:
+    """文本的任一三连字可能命中位图则返回True（可能误报，不会漏报）"""
+    for i in range(len(text) - 2):
+        h = hash(text[i:i + 3])
+        if (bloom >> (h & _BLOOM_MASK)) & 1 and (bloom >> ((h >> 17) & _BLOOM_MASK)) & 1:
+            return True
+    return False
+
+
+class _IndexEntry(NamedTuple):
+    """词库索引中的展开词条（具名字段，匹配路径上零dict查找）"""
+    key: str
+    idx: int
+    responses: List[str]
+    mode: int
+
+
+# 数学表达式白名单之外的字符（命中即拒绝求值）
+_UNSAFE_MATH_RE = re.compile(r'[^0-9+\-*/.() ]')
+
+# 乘方操作数上限（与simpleeval的MAX_POWER一致，防止巨数计算阻塞事件循环）
+_MAX_POWER = 4000000
+
+# 受限AST求值允许的运算符
+_EVAL_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
 
 class SafeMathEvaluator:
     """安全的数学表达式求值器"""
-    
-    def __init__(self):
-        self._cache = {}
-        
+
+    def __init__(self, use_simpleeval: bool = True):
+        self.use_simpleeval = use_simpleeval
+        # 结果缓存按LRU限容，防止长期运行内存无界增长
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_max = 512
+        self._ast_cache: Dict[str, ast.Expression] = {}
+
     def evaluate(self, expr: str) -> Optional[Union[int, float]]:
         """安全地计算数学表达式"""
         if not expr:
             return None
             
-        # 缓存结果
+        # 缓存结果（命中移到队尾，保持LRU顺序）
         if expr in self._cache:
+            self._cache.move_to_end(expr)
             return self._cache[expr]
         
         # 清理表达式
         expr = expr.strip()
         
         # 只允许数字、基本运算符和括号
-        safe_chars = set('0123456789+-*/.() ')
-        if not all(c in safe_chars for c in expr):
+        if _UNSAFE_MATH_RE.search(expr):
             logger.warning(f"表达式包含不安全字符: {expr}")
             return None
         
         try:
-            if SIMPLEEVAL_AVAILABLE:
+            if SIMPLEEVAL_AVAILABLE and self.use_simpleeval:
                 # 使用 simpleeval 进行安全求值
                 result = simple_eval(expr)
             else:
-                # 备用方案：仅支持基础四则运算
-                result = self._basic_eval(expr)
+                # 备用方案：受限AST求值，仅支持基础算术
+                result = self._ast_eval(expr)
             
             # 处理整数结果
             if isinstance(result, float) and result.is_integer():
                 result = int(result)
             
             self._cache[expr] = result
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
             return result
             
         except (InvalidExpression, SyntaxError, ZeroDivisionError, ValueError) as e:
             logger.warning(f"表达式求值失败: {expr}, 错误: {e}")
             return None
     
-    def _basic_eval(self, expr: str) -> Union[int, float]:
-        """基础四则运算求值（备用方案）"""
-        # 移除空格
-        expr = expr.replace(' ', '')
-        
-        # 处理括号
-        while '(' in expr:
-            start = expr.rfind('(')
-            end = expr.find(')', start)
-            if end == -1:
-                break
-            sub_expr = expr[start+1:end]
-            sub_result = self._basic_eval(sub_expr)
-            expr = expr[:start] + str(sub_result) + expr[end+1:]
-        
-        # 处理乘除法
-        operators = [('*', lambda a, b: a * b), 
-                    ('/', lambda a, b: a / b if b != 0 else 0)]
-        
-        for op, func in operators:
-            while op in expr:
-                idx = expr.find(op)
-                left = self._extract_left_number(expr, idx)
-                right = self._extract_right_number(expr, idx)
-                result = func(left, right)
-                expr = expr[:idx-len(str(left))] + str(result) + expr[idx+len(str(right))+1:]
-        
-        # 处理加减法
-        result = 0
-        current_num = ''
-        current_op = '+'
-        
-        for i, char in enumerate(expr):
-            if char in '+-' or i == len(expr) - 1:
-                if i == len(expr) - 1:
-                    current_num += char
-                
-                if current_num:
-                    num = float(current_num) if '.' in current_num else int(current_num)
-                    if current_op == '+':
-                        result += num
-                    else:
-                        result -= num
-                
-                if char in '+-':
-                    current_op = char
-                    current_num = ''
-            else:
-                current_num += char
-        
-        return result
-    
-    def _extract_left_number(self, expr: str, idx: int) -> Union[int, float]:
-        """向左提取数字"""
-        i = idx - 1
-        num_str = ''
-        
-        while i >= 0 and expr[i] in '0123456789.':
-            num_str = expr[i] + num_str
-            i -= 1
-        
-        if '.' in num_str:
-            return float(num_str)
-        return int(num_str) if num_str else 0
-    
-    def _extract_right_number(self, expr: str, idx: int) -> Union[int, float]:
-        """向右提取数字"""
-        i = idx + 1
-        num_str = ''
-        
-        while i < len(expr) and expr[i] in '0123456789.':
-            num_str += expr[i]
-            i += 1
-        
-        if '.' in num_str:
-            return float(num_str)
-        return int(num_str) if num_str else 0
+    def _ast_eval(self, expr: str) -> Union[int, float]:
+        """受限AST求值（备用方案）
+
+        解析结果按表达式缓存，重复表达式跳过parse；求值只允许
+        数字常量和 _EVAL_OPS 中的运算符，其它节点直接抛错。
+        """
+        tree = self._ast_cache.get(expr)
+        if tree is None:
+            tree = ast.parse(expr, mode='eval')
+            if len(self._ast_cache) >= 256:
+                # 简单限容，丢弃最早的条目
+                self._ast_cache.pop(next(iter(self._ast_cache)))
+            self._ast_cache[expr] = tree
+        return self._eval_node(tree.body)
+
+    def _eval_node(self, node: ast.AST) -> Union[int, float]:
+        """递归求值受限的AST节点"""
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, (int, float)):
+                return node.value
+            raise ValueError(f"不支持的常量: {node.value!r}")
+
+        if isinstance(node, ast.BinOp):
+            op = _EVAL_OPS.get(type(node.op))
+            if op is None:
+                raise ValueError(f"不支持的运算符: {type(node.op).__name__}")
+            left = self._eval_node(node.left)
+            right = self._eval_node(node.right)
+            if isinstance(node.op, ast.Pow) and (
+                abs(left) > _MAX_POWER or abs(right) > _MAX_POWER
+            ):
+                # 同步求值在事件循环里执行，巨数乘方会卡死整个机器人
+                raise ValueError(f"乘方操作数过大: {left}**{right}")
+            return op(left, right)
+
+        if isinstance(node, ast.UnaryOp):
+            op = _EVAL_OPS.get(type(node.op))
+            if op is None:
+                raise ValueError(f"不支持的运算符: {type(node.op).__name__}")
+            return op(self._eval_node(node.operand))
+
+        raise ValueError(f"不支持的表达式节点: {type(node).__name__}")
 
 
 class CoolingManager:
@@ -153,12 +327,18 @@ class CoolingManager:
     def __init__(self, data_dir: Path):
         self.data_dir = data_dir
         self._cooling_data: Dict[str, Dict[Tuple[str, int], float]] = {}
-        self._lock = asyncio.Lock()
-        self._dirty = False
-        self._save_task = None
+        # 每个词库独立的锁/脏标记/保存任务，避免不同群互相取消写盘
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._dirty: Set[str] = set()
+        self._save_tasks: Dict[str, asyncio.Task] = {}
+        # 按过期时间排序的小顶堆，用于增量清理过期记录
+        self._heaps: Dict[str, List[Tuple[float, Tuple[str, int]]]] = defaultdict(list)
+        # 日志追加计数，达到阈值后压实为快照
+        self._journal_counts: Dict[str, int] = {}
+        self._journal_compact_threshold = 256
         
-    async def check_cooling(self, user_id: str, lexicon_id: str, item_index: int) -> Union[bool, int]:
-        """检查冷却时间"""
+    async def check_cooling(self, user_id: str, lexicon_id: str, item_index: int) -> int:
+        """检查冷却时间（返回剩余秒数，0表示无冷却）"""
         key = (user_id, item_index)
         cooling_key = f"cooling_{lexicon_id}"
         
@@ -166,38 +346,69 @@ class CoolingManager:
         if cooling_key not in self._cooling_data:
             await self._load_cooling_data(lexicon_id)
         
-        async with self._lock:
+        async with self._locks[lexicon_id]:
+            if self._sweep_expired(cooling_key, time.time()):
+                self._dirty.add(lexicon_id)
+
             if cooling_key in self._cooling_data and key in self._cooling_data[cooling_key]:
                 expire_time = self._cooling_data[cooling_key][key]
                 current_time = time.time()
-                
+
                 if current_time >= expire_time:
                     # 冷却已结束，删除记录
                     del self._cooling_data[cooling_key][key]
-                    self._dirty = True
-                    return False  # 没有冷却
+                    self._dirty.add(lexicon_id)
+                    return 0  # 没有冷却
                 else:
                     # 返回剩余秒数（整数）
-                    remaining = int(expire_time - current_time)
-                    return remaining if remaining > 0 else False
-        
-        return False  # 没有冷却记录
+                    return int(expire_time - current_time)
+
+        return 0  # 没有冷却记录
     
     async def set_cooling(self, user_id: str, lexicon_id: str, item_index: int, seconds: int):
         """设置冷却时间"""
         key = (user_id, item_index)
         cooling_key = f"cooling_{lexicon_id}"
         
-        async with self._lock:
+        async with self._locks[lexicon_id]:
             if cooling_key not in self._cooling_data:
                 self._cooling_data[cooling_key] = {}
-            
+
             expire_time = time.time() + seconds
             self._cooling_data[cooling_key][key] = expire_time
-            self._dirty = True
-        
-        # 触发异步保存
-        await self._schedule_save(lexicon_id)
+            heapq.heappush(self._heaps[cooling_key], (expire_time, key))
+            self._dirty.add(lexicon_id)
+
+        # 追加一行冷却日志（避免整文件重写），积累到阈值后压实
+        await self._append_journal(lexicon_id, user_id, item_index, expire_time)
+        count = self._journal_counts.get(lexicon_id, 0) + 1
+        self._journal_counts[lexicon_id] = count
+        if count >= self._journal_compact_threshold:
+            await self._schedule_save(lexicon_id)
+
+    def _sweep_expired(self, cooling_key: str, now: float) -> bool:
+        """按堆顶增量删除已过期的冷却记录，返回是否有删除"""
+        heap = self._heaps.get(cooling_key)
+        if not heap:
+            return False
+
+        data = self._cooling_data.get(cooling_key, {})
+        removed = False
+        while heap and heap[0][0] <= now:
+            expire_time, key = heapq.heappop(heap)
+            # 记录可能已被更新为更晚的过期时间，堆中留有旧条目
+            if data.get(key) == expire_time:
+                del data[key]
+                removed = True
+        return removed
+
+    async def _append_journal(self, lexicon_id: str, user_id: str, item_index: int, expire_time: float):
+        """向冷却日志追加一条记录"""
+        journal_path = self.data_dir / "cooling" / f"{lexicon_id}.log"
+        try:
+            await asyncio.to_thread(_append_text, journal_path, f"{user_id}\t{item_index}\t{expire_time}\n")
+        except Exception as e:
+            logger.error(f"写入冷却日志失败 {lexicon_id}: {e}")
     
     async def _load_cooling_data(self, lexicon_id: str):
         """从文件加载冷却数据"""
@@ -205,74 +416,96 @@ class CoolingManager:
         
         cooling_path = self.data_dir / "cooling" / f"{lexicon_id}.json"
         
+        cooling_data: Dict[Tuple[str, int], float] = {}
+
         if await aos.path.exists(cooling_path):
             try:
-                async with aiofiles.open(cooling_path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    data = json.loads(content)
-                    
-                    # 转换为内存格式
-                    cooling_data = {}
+                content = await asyncio.to_thread(_read_text, cooling_path)
+                data = _json_loads(content)
+
+                # 转换为内存格式（新快照为扁平三元组列表，旧快照为字典列表）
+                if data and isinstance(data[0], dict):
                     for entry in data:
                         key = (entry["user_id"], entry["item_index"])
                         cooling_data[key] = entry["expire_time"]
-                    
-                    self._cooling_data[cooling_key] = cooling_data
-                    
+                else:
+                    for i in range(0, len(data), 3):
+                        cooling_data[(data[i], data[i + 1])] = data[i + 2]
+
             except Exception as e:
                 logger.error(f"加载冷却数据失败 {lexicon_id}: {e}")
-                self._cooling_data[cooling_key] = {}
-        else:
-            self._cooling_data[cooling_key] = {}
+
+        # 回放快照之后追加的冷却日志
+        journal_path = self.data_dir / "cooling" / f"{lexicon_id}.log"
+        if await aos.path.exists(journal_path):
+            try:
+                content = await asyncio.to_thread(_read_text, journal_path)
+                for line in content.splitlines():
+                    parts = line.split('\t')
+                    if len(parts) == 3:
+                        cooling_data[(parts[0], int(parts[1]))] = float(parts[2])
+            except Exception as e:
+                logger.error(f"回放冷却日志失败 {lexicon_id}: {e}")
+
+        # 过滤已过期的记录
+        current_time = time.time()
+        self._cooling_data[cooling_key] = {
+            key: expire_time
+            for key, expire_time in cooling_data.items()
+            if expire_time > current_time
+        }
+
+        # 重建过期时间堆
+        heap = [(expire_time, key) for key, expire_time in self._cooling_data[cooling_key].items()]
+        heapq.heapify(heap)
+        self._heaps[cooling_key] = heap
     
     async def _schedule_save(self, lexicon_id: str):
-        """计划保存数据（防抖）"""
-        if self._save_task and not self._save_task.done():
-            self._save_task.cancel()
-        
-        self._save_task = asyncio.create_task(self._save_cooling_data(lexicon_id))
+        """计划保存数据（防抖，按词库独立）"""
+        task = self._save_tasks.get(lexicon_id)
+        if task and not task.done():
+            task.cancel()
+
+        self._save_tasks[lexicon_id] = asyncio.create_task(self._save_cooling_data(lexicon_id))
     
     async def _save_cooling_data(self, lexicon_id: str):
         """保存冷却数据"""
         await asyncio.sleep(1)  # 防抖延迟
         
-        async with self._lock:
-            if not self._dirty:
+        async with self._locks[lexicon_id]:
+            if lexicon_id not in self._dirty:
                 return
-            
+
             cooling_key = f"cooling_{lexicon_id}"
             if cooling_key not in self._cooling_data:
                 return
             
-            # 过滤已过期的数据
-            current_time = time.time()
-            valid_data = {
-                key: expire_time 
-                for key, expire_time in self._cooling_data[cooling_key].items()
-                if expire_time > current_time
-            }
-            self._cooling_data[cooling_key] = valid_data
-            
-            # 转换为可序列化格式
-            save_data = [
-                {
-                    "user_id": user_id,
-                    "item_index": item_index,
-                    "expire_time": expire_time
-                }
-                for (user_id, item_index), expire_time in valid_data.items()
-            ]
-            
+            # 增量清理已过期的数据
+            self._sweep_expired(cooling_key, time.time())
+            valid_data = self._cooling_data[cooling_key]
+
+
+            # 转换为可序列化格式（扁平三元组列表，比字典列表更小更快）
+            save_data = []
+            for (user_id, item_index), expire_time in valid_data.items():
+                save_data.extend((user_id, item_index, expire_time))
+
             # 保存到文件
             try:
                 cooling_dir = self.data_dir / "cooling"
                 await aos.makedirs(cooling_dir, exist_ok=True)
                 cooling_path = cooling_dir / f"{lexicon_id}.json"
-                
-                async with aiofiles.open(cooling_path, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(save_data, indent=2, ensure_ascii=False))
-                
-                self._dirty = False
+
+                await asyncio.to_thread(
+                    _write_text, cooling_path, _json_dumps(save_data)
+                )
+
+                # 快照已落盘，清空日志并重置计数
+                journal_path = cooling_dir / f"{lexicon_id}.log"
+                await asyncio.to_thread(_write_text, journal_path, "")
+                self._journal_counts[lexicon_id] = 0
+
+                self._dirty.discard(lexicon_id)
                 logger.debug(f"冷却数据已保存: {lexicon_id}")
                 
             except Exception as e:
@@ -292,12 +525,49 @@ class KeywordManager:
         if not lexicon_dir.exists():
             lexicon_dir.mkdir(parents=True, exist_ok=True)
             logger.info(f"创建词库目录: {lexicon_dir}")
+        self._lexicon_dir = lexicon_dir
         
-        self.lexicons: Dict[str, Dict] = {}
+        # 已加载词库的LRU缓存（限容，逐出前先落盘脏数据）
+        self.lexicons: OrderedDict = OrderedDict()
+        self._lexicon_cache_max = 64
+        self.lexicon_index: Dict[str, Dict] = {}
+        # 词条 -> (下标, 值) 变更索引：管理操作O(1)定位词条
+        self._by_key: Dict[str, Dict[str, Tuple[int, Dict]]] = {}
         self.switch_config: Dict[str, str] = {}
         self.select_config: Dict[str, str] = {}
-        self.math_evaluator = SafeMathEvaluator()
+        self.math_evaluator = SafeMathEvaluator(
+            use_simpleeval=config.get("use_simpleeval", True)
+        )
         self.cooling_manager = CoolingManager(self.data_dir)
+        # 独立RNG实例，绕开模块级Random的全局锁
+        self._rng = random.Random()
+        # [命令] 消息段分发表：命令名（含中文别名）-> 处理函数
+        self._cmd_dispatch = {
+            "image": self._emit_image, "图片": self._emit_image,
+            "at": self._emit_at, "艾特": self._emit_at,
+            "face": self._emit_face, "表情": self._emit_face,
+            "reply": self._emit_reply, "回复": self._emit_reply,
+            "record": self._emit_record, "语音": self._emit_record,
+            "poke": self._emit_poke,
+        }
+        # 词库写盘防抖：脏词库集合与每个词库的延迟写盘任务
+        self._dirty_lexicons: set = set()
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        self._flush_delay = 0.5
+        # (group_id, user_id) -> 词库ID 解析缓存，配置变化时整体失效
+        self._resolved_id: Dict[Tuple[str, str], str] = {}
+        # 词库打包文件的重写任务（防抖）
+        self._pack_task: Optional[asyncio.Task] = None
+        # select.txt 写盘防抖任务
+        self._select_task: Optional[asyncio.Task] = None
+        # 内置关键词列表展示文本（懒构建，内置词库运行期不变）
+        self._builtin_summary: Optional[str] = None
+        # [图片.本地文件] 路径解析缓存（LRU限容）
+        self._filecache_paths: OrderedDict = OrderedDict()
+        self._filecache_paths_max = 512
+        # 匹配结果模板缓存：(词库列表, 是否管理员, 消息文本) -> 命中模板/None
+        self._match_cache: OrderedDict = OrderedDict()
+        self._match_cache_max = 4096
         
         # 内置词库内容
         self.builtin_keywords = [
@@ -389,7 +659,10 @@ class KeywordManager:
         
         # 异步加载配置
         await self.load_configs()
-        
+
+        # 预加载打包词库（单次大读取代替首次使用时的多次小读取）
+        await self._load_packed_lexicons()
+
         # 创建内置词库
         await self._create_builtin_lexicon()
         
@@ -415,34 +688,22 @@ class KeywordManager:
     async def load_configs(self):
         """异步加载配置文件"""
         # 加载开关配置
-        switch_path = self.data_dir / "switch.txt"
-        if await aos.path.exists(switch_path):
-            try:
-                async with aiofiles.open(switch_path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    for line in content.splitlines():
-                        line = line.strip()
-                        if line and '=' in line:
-                            k, v = line.split('=', 1)
-                            self.switch_config[k.strip()] = v.strip()
+        try:
+            self.switch_config = await asyncio.to_thread(_parse_kv, self.data_dir / "switch.txt")
+            if self.switch_config:
                 logger.info(f"加载开关配置: {len(self.switch_config)} 条")
-            except Exception as e:
-                logger.error(f"加载开关配置失败: {e}")
-        
+        except Exception as e:
+            logger.error(f"加载开关配置失败: {e}")
+
         # 加载选择配置
-        select_path = self.data_dir / "select.txt"
-        if await aos.path.exists(select_path):
-            try:
-                async with aiofiles.open(select_path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    for line in content.splitlines():
-                        line = line.strip()
-                        if line and '=' in line:
-                            k, v = line.split('=', 1)
-                            self.select_config[k.strip()] = v.strip()
+        try:
+            self.select_config = await asyncio.to_thread(_parse_kv, self.data_dir / "select.txt")
+            if self.select_config:
                 logger.info(f"加载选择配置: {len(self.select_config)} 条")
-            except Exception as e:
-                logger.error(f"加载选择配置失败: {e}")
+        except Exception as e:
+            logger.error(f"加载选择配置失败: {e}")
+
+        self.invalidate_resolved_ids()
     
     async def _create_builtin_lexicon(self):
         """创建内置词库"""
@@ -452,8 +713,7 @@ class KeywordManager:
         # 如果内置词库已存在，检查是否需要更新
         if await aos.path.exists(builtin_path):
             try:
-                async with aiofiles.open(builtin_path, 'r', encoding='utf-8') as f:
-                    existing_data = json.loads(await f.read())
+                existing_data = _json_loads(await asyncio.to_thread(_read_text, builtin_path))
                 
                 # 检查版本标识
                 if existing_data.get("_metadata", {}).get("version") == "1.0":
@@ -486,185 +746,476 @@ class KeywordManager:
         
         # 保存内置词库
         try:
-            async with aiofiles.open(builtin_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(builtin_lexicon, indent=4, ensure_ascii=False))
+            await asyncio.to_thread(
+                _write_text, builtin_path,
+                _json_dumps(builtin_lexicon)
+            )
+            # 打包预载可能已把旧版内置词库读进内存，重写文件后必须淘汰
+            # 缓存副本，否则旧数据会被继续使用并随下次打包覆盖新文件
+            if self.lexicons.pop(builtin_lexicon_id, None) is not None:
+                self.lexicon_index.pop(builtin_lexicon_id, None)
+                self._by_key.pop(builtin_lexicon_id, None)
+                self._match_cache.clear()
             logger.info(f"内置词库创建成功: {builtin_lexicon_id}")
-            
+
         except Exception as e:
             logger.error(f"创建内置词库失败: {e}")
     
+    def builtin_summary(self) -> str:
+        """内置关键词列表的展示文本（内置词库不变，只格式化一次）"""
+        if self._builtin_summary is None:
+            items = [
+                f"{i}. 【{item['keyword']}】\n"
+                f"   模式: {'模糊' if item['mode'] == 0 else '精确'}\n"
+                f"   描述: {item['description']}\n"
+                f"   回复数: {len(item['responses'])}\n"
+                for i, item in enumerate(self.builtin_keywords, 1)
+            ]
+            self._builtin_summary = "🌟 内置关键词列表 🌟\n\n" + "\n".join(items)
+        return self._builtin_summary
+
+    def _lexicon_path(self, lexicon_id: str) -> Path:
+        """词库文件路径（目录在初始化时已确定）"""
+        return self._lexicon_dir / f"{lexicon_id}.json"
+
+    def invalidate_resolved_ids(self):
+        """switch/select配置变化后清空词库ID解析缓存"""
+        self._resolved_id.clear()
+
     def get_lexicon_id(self, group_id: str, user_id: str = "") -> str:
         """
         获取词库ID
         逻辑：优先使用用户选择的词库，然后使用群组开关配置的词库，最后使用默认词库
+        结果按 (group_id, user_id) 缓存，配置变化时失效
         """
+        cache_key = (group_id, user_id)
+        cached = self._resolved_id.get(cache_key)
+        if cached is not None:
+            return cached
+
         # 1. 用户选择的词库（通过select.txt配置）
-        if user_id and user_id in self.select_config:
-            lexicon_id = self.select_config[user_id]
+        lexicon_id = self.select_config.get(user_id) if user_id else None
+        if lexicon_id:
             logger.debug(f"使用用户选择词库: user={user_id}, lexicon={lexicon_id}")
-            return lexicon_id
-        
-        # 2. 群组开关配置的词库（通过switch.txt配置）
-        if group_id and group_id in self.switch_config:
-            lexicon_id = self.switch_config[group_id]
+        else:
+            # 2. 群组开关配置的词库（通过switch.txt配置）
+            lexicon_id = self.switch_config.get(group_id) if group_id else None
             if lexicon_id:  # 非空字符串
                 logger.debug(f"使用群组开关词库: group={group_id}, lexicon={lexicon_id}")
-                return lexicon_id
-        
-        # 3. 默认词库（私聊使用用户ID，群聊使用群组ID）
-        if not group_id or group_id == "":
-            # 私聊：使用用户ID作为词库ID
-            lexicon_id = f"private_{user_id}"
-        else:
-            # 群聊：使用群组ID作为词库ID
-            lexicon_id = group_id
-        
-        logger.debug(f"使用默认词库: group={group_id}, user={user_id}, lexicon={lexicon_id}")
+            else:
+                # 3. 默认词库（私聊使用用户ID，群聊使用群组ID）
+                lexicon_id = f"private_{user_id}" if not group_id else group_id
+                logger.debug(f"使用默认词库: group={group_id}, user={user_id}, lexicon={lexicon_id}")
+
+        self._resolved_id[cache_key] = lexicon_id
         return lexicon_id
     
+    async def _cache_lexicon(self, lexicon_id: str, data: Dict):
+        """放入词库缓存并按LRU限容（被逐出的脏词库先落盘）"""
+        if self.lexicons.get(lexicon_id) is not data:
+            # 数据对象被整体替换，旧的变更索引失效
+            self._by_key.pop(lexicon_id, None)
+        self.lexicons[lexicon_id] = data
+        self.lexicons.move_to_end(lexicon_id)
+
+        while len(self.lexicons) > self._lexicon_cache_max:
+            old_id = next(iter(self.lexicons))
+            if old_id in self._dirty_lexicons:
+                await self._flush_lexicon(old_id)
+            del self.lexicons[old_id]
+            self.lexicon_index.pop(old_id, None)
+            self._by_key.pop(old_id, None)
+
     async def get_lexicon(self, lexicon_id: str, user_id: str = "") -> Dict:
         """获取词库数据"""
-        lexicon_path = self.data_dir / "lexicon" / f"{lexicon_id}.json"
+        lexicon_path = self._lexicon_path(lexicon_id)
 
         # 内存缓存
         if lexicon_id in self.lexicons:
+            self.lexicons.move_to_end(lexicon_id)
             return self.lexicons[lexicon_id]
 
         try:
             if await aos.path.exists(lexicon_path):
                 logger.info(f"从文件加载词库: {lexicon_path}")
-                async with aiofiles.open(lexicon_path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    data = json.loads(content)
-                    self.lexicons[lexicon_id] = data
-                    
-                    # 记录词库信息
-                    word_count = len(data.get("work", []))
-                    logger.info(f"词库 {lexicon_id} 加载成功，包含 {word_count} 个词条")
-                    return data
+                content = await asyncio.to_thread(_read_text, lexicon_path)
+                data = _json_loads(content)
+                await self._cache_lexicon(lexicon_id, data)
+                self._build_index(lexicon_id, data)
+
+                # 记录词库信息
+                word_count = len(data.get("work", []))
+                logger.info(f"词库 {lexicon_id} 加载成功，包含 {word_count} 个词条")
+                return data
             else:
                 logger.info(f"词库文件不存在，创建空词库: {lexicon_path}")
                 # 创建空词库文件
                 empty_data = {"work": []}
-                async with aiofiles.open(lexicon_path, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(empty_data, indent=4, ensure_ascii=False))
-                
-                self.lexicons[lexicon_id] = empty_data
+                await asyncio.to_thread(
+                    _write_text, lexicon_path,
+                    _json_dumps(empty_data)
+                )
+
+                await self._cache_lexicon(lexicon_id, empty_data)
                 return empty_data
                 
         except Exception as e:
             logger.error(f"加载词库失败 {lexicon_id}: {e}")
             # 返回空词库
             empty_data = {"work": []}
-            self.lexicons[lexicon_id] = empty_data
+            await self._cache_lexicon(lexicon_id, empty_data)
             return empty_data
 
+    def _build_index(self, lexicon_id: str, data: Dict) -> Dict:
+        """为词库构建匹配索引
+
+        精确词条进哈希表（O(1)查找），模糊词条进Aho-Corasick自动机
+        （单次扫描文本即可命中），通配符词条单独成列表。索引内只存
+        展开后的 _IndexEntry 具名元组，匹配路径不再逐条访问原始的
+        嵌套dict；磁盘上的AoS结构保持不变。
+        """
+        exact: Dict[str, _IndexEntry] = {}
+        fuzzy: List[_IndexEntry] = []
+        wildcards: List[_IndexEntry] = []
+
+        for idx, item in enumerate(data.get("work", [])):
+            for key, value in item.items():
+                mode = value.get("s")
+                responses = value.get("r", [])
+                if "[n." in key:
+                    wildcards.append(_IndexEntry(key, idx, responses, mode))
+                elif mode == 1:
+                    exact.setdefault(key, _IndexEntry(key, idx, responses, mode))
+                elif mode == 0:
+                    fuzzy.append(_IndexEntry(key, idx, responses, mode))
+
+        automaton = None
+        if AHOCORASICK_AVAILABLE and fuzzy:
+            try:
+                automaton = ahocorasick.Automaton()
+                for entry in fuzzy:
+                    automaton.add_word(entry.key, entry)
+                automaton.make_automaton()
+            except Exception as e:
+                logger.warning(f"构建模糊匹配自动机失败 {lexicon_id}: {e}")
+                automaton = None
+
+        # 线性扫描兜底时的布隆预检：所有模糊词条≥3字才有效（短词条
+        # 无法用三连字证明不存在）；自动机可用时扫描已在C层，无需预检
+        fuzzy_bloom = None
+        if automaton is None and fuzzy and all(len(e.key) >= 3 for e in fuzzy):
+            fuzzy_bloom = 0
+            for e in fuzzy:
+                fuzzy_bloom = _bloom_add(fuzzy_bloom, e.key)
+
+        index = {
+            "exact": exact,
+            "fuzzy": fuzzy,
+            "automaton": automaton,
+            "fuzzy_bloom": fuzzy_bloom,
+            "wildcards": wildcards
+        }
+        self.lexicon_index[lexicon_id] = index
+        return index
+
+    def _get_index(self, lexicon_id: str, data: Dict) -> Dict:
+        """获取词库索引（没有则构建）"""
+        index = self.lexicon_index.get(lexicon_id)
+        if index is None:
+            index = self._build_index(lexicon_id, data)
+        return index
+
+    def _get_by_key(self, lexicon_id: str, data: Dict) -> Dict[str, Tuple[int, Dict]]:
+        """获取 词条->(下标, 值) 的变更索引（没有则构建）
+
+        管理操作（加词/加选项/删选项/导入）用它把存在性检查和定位
+        从O(N)线性扫描降为O(1)哈希查找；各操作负责同步维护该索引，
+        结构性删除导致下标偏移时整体失效。
+        """
+        by_key = self._by_key.get(lexicon_id)
+        if by_key is None:
+            by_key = {}
+            for idx, item in enumerate(data.get("work", [])):
+                for key, value in item.items():
+                    by_key.setdefault(key, (idx, value))
+            self._by_key[lexicon_id] = by_key
+        return by_key
+
     async def save_lexicon(self, lexicon_id: str, data: Dict):
-        """保存词库"""
-        lexicon_path = self.data_dir / "lexicon" / f"{lexicon_id}.json"
-        self.lexicons[lexicon_id] = data
+        """保存词库（标记脏，短暂延迟后合并写盘）"""
+        await self._cache_lexicon(lexicon_id, data)
+        # 词库内容变化，索引和匹配结果缓存失效，下次搜索时重建
+        self.lexicon_index.pop(lexicon_id, None)
+        self._match_cache.clear()
+
+        self._dirty_lexicons.add(lexicon_id)
+        task = self._flush_tasks.get(lexicon_id)
+        if task is None or task.done():
+            self._flush_tasks[lexicon_id] = asyncio.create_task(self._flush_later(lexicon_id))
+
+    async def _flush_later(self, lexicon_id: str):
+        """延迟写盘，合并窗口内的多次修改"""
+        await asyncio.sleep(self._flush_delay)
+        await self._flush_lexicon(lexicon_id)
+
+    async def _flush_lexicon(self, lexicon_id: str):
+        """将脏词库写入磁盘"""
+        if lexicon_id not in self._dirty_lexicons:
+            return
 
+        data = self.lexicons.get(lexicon_id)
+        if data is None:
+            self._dirty_lexicons.discard(lexicon_id)
+            return
+
+        lexicon_path = self._lexicon_path(lexicon_id)
         try:
-            async with aiofiles.open(lexicon_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(data, indent=4, ensure_ascii=False))
+            await asyncio.to_thread(_write_text_atomic, lexicon_path, _json_dumps(data))
+            self._dirty_lexicons.discard(lexicon_id)
+            self._schedule_pack_rewrite()
             logger.info(f"词库保存成功: {lexicon_id}, 词条数: {len(data.get('work', []))}")
         except Exception as e:
             logger.error(f"保存词库失败 {lexicon_id}: {e}")
 
+    async def force_flush(self, lexicon_id: str):
+        """立即写盘指定词库（备份前调用，保证磁盘内容与内存一致）"""
+        task = self._flush_tasks.pop(lexicon_id, None)
+        if task and not task.done():
+            task.cancel()
+        await self._flush_lexicon(lexicon_id)
+
+    def schedule_select_save(self):
+        """防抖保存select.txt（合并连续的切换操作）"""
+        if self._select_task and not self._select_task.done():
+            self._select_task.cancel()
+        self._select_task = asyncio.create_task(self._save_select(delay=self._flush_delay))
+
+    async def _save_select(self, delay: float = 0):
+        """写盘select.txt（临时文件+原子替换）"""
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            await asyncio.to_thread(
+                _write_text_atomic, self.data_dir / "select.txt",
+                _format_kv(self.select_config)
+            )
+        except Exception as e:
+            logger.error(f"保存选择配置失败: {e}")
+
+    async def flush_all(self):
+        """立即写盘所有待保存的词库（插件卸载时调用）"""
+        for task in list(self._flush_tasks.values()):
+            if not task.done():
+                task.cancel()
+        self._flush_tasks.clear()
+
+        for lexicon_id in list(self._dirty_lexicons):
+            await self._flush_lexicon(lexicon_id)
+
+        if self._pack_task and not self._pack_task.done():
+            self._pack_task.cancel()
+        await self._write_pack()
+
+        if self._select_task and not self._select_task.done():
+            self._select_task.cancel()
+            await self._save_select()
+
+    def _pack_path(self) -> Path:
+        """词库打包文件路径"""
+        return self._lexicon_dir / "_packed.json"
+
+    async def _load_packed_lexicons(self):
+        """启动时从打包文件批量预加载词库
+
+        单个词库文件比打包文件新时（例如上次打包前进程被杀），
+        以单文件为准，跳过打包中的旧数据。
+        """
+        pack_path = self._pack_path()
+        if not await aos.path.exists(pack_path):
+            return
+
+        try:
+            content = await asyncio.to_thread(_read_text, pack_path)
+            packed = _json_loads(content)
+            pack_mtime = (await aos.stat(pack_path)).st_mtime
+
+            loaded = 0
+            for lexicon_id, data in packed.items():
+                lexicon_path = self._lexicon_path(lexicon_id)
+                try:
+                    if await aos.path.exists(lexicon_path) and \
+                            (await aos.stat(lexicon_path)).st_mtime > pack_mtime:
+                        continue
+                except OSError:
+                    pass
+                self.lexicons[lexicon_id] = data
+                loaded += 1
+
+            logger.info(f"从打包文件预加载词库: {loaded} 个")
+        except Exception as e:
+            logger.warning(f"加载词库打包文件失败: {e}")
+
+    def _schedule_pack_rewrite(self):
+        """计划重写打包文件（防抖）"""
+        if self._pack_task and not self._pack_task.done():
+            return
+        self._pack_task = asyncio.create_task(self._rewrite_pack_later())
+
+    async def _rewrite_pack_later(self):
+        """延迟重写打包文件"""
+        await asyncio.sleep(self._flush_delay)
+        await self._write_pack()
+
+    async def _write_pack(self):
+        """将当前已加载的词库写入打包文件"""
+        if not self.lexicons:
+            return
+        try:
+            await asyncio.to_thread(_write_text, self._pack_path(), _json_dumps(self.lexicons))
+            logger.debug(f"词库打包文件已更新: {len(self.lexicons)} 个词库")
+        except Exception as e:
+            logger.error(f"写入词库打包文件失败: {e}")
+
+    def _pick_response(self, responses: List[str]) -> str:
+        """从回复列表随机取一条（单条回复直接返回，不走RNG）"""
+        if len(responses) == 1:
+            return responses[0]
+        return responses[self._rng.randrange(len(responses))]
+
     async def search_keyword(self, text: str, group_id: str, user_id: str, is_admin: bool = False) -> Optional[Dict]:
-        """搜索匹配的关键词"""
+        """搜索匹配的关键词（结果模板按消息文本LRU缓存，回复仍每次随机挑选）"""
         current_lexicon_id = self.get_lexicon_id(group_id, user_id)
-        
+
         # 搜索顺序：内置词库 -> 当前词库 -> 默认词库
         lexicon_ids = ["builtin_default", current_lexicon_id]
-        
+
         # 如果是群聊，并且当前不是使用的群组默认词库，则也搜索群组默认词库
         if group_id and current_lexicon_id != group_id:
             lexicon_ids.append(group_id)
-        
+
         # 如果是私聊，并且当前不是使用的用户默认词库，则也搜索用户默认词库
         if not group_id and current_lexicon_id != f"private_{user_id}":
             lexicon_ids.append(f"private_{user_id}")
 
-        logger.debug(f"搜索关键词: text='{text}', group={group_id}, user={user_id}")
-        logger.debug(f"搜索词库列表: {lexicon_ids}")
+        # 去重（保持顺序），避免同一词库被扫描两次
+        lexicon_ids = list(dict.fromkeys(lexicon_ids))
+
+        # 相同消息直接复用匹配模板（词库变更时缓存整体清空）
+        cache_key = (tuple(lexicon_ids), is_admin, text)
+        if cache_key in self._match_cache:
+            self._match_cache.move_to_end(cache_key)
+            template = self._match_cache[cache_key]
+        else:
+            template = await self._search_lexicons(text, lexicon_ids, is_admin)
+            self._match_cache[cache_key] = template
+            if len(self._match_cache) > self._match_cache_max:
+                self._match_cache.popitem(last=False)
+
+        if template is None:
+            return None
+        result = dict(template)
+        result["response"] = self._pick_response(result.pop("responses"))
+        return result
+
+    async def _search_lexicons(self, text: str, lexicon_ids: List[str], is_admin: bool) -> Optional[Dict]:
+        """按顺序扫描词库，返回命中模板（含回复列表，不做随机挑选）"""
+        # 每条消息都会走到这里，DEBUG关闭时跳过f-string格式化
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug(f"搜索关键词: text='{text}'")
+            logger.debug(f"搜索词库列表: {lexicon_ids}")
 
         for lid in lexicon_ids:
             try:
                 lex_data = await self.get_lexicon(lid, "")
-                logger.debug(f"检查词库 {lid}: 词条数={len(lex_data.get('work', []))}")
-                
-                for idx, item in enumerate(lex_data.get("work", [])):
-                    for key, value in item.items():
-                        # 检查管理员模式
-                        if value.get("s") == 10 and not is_admin:
-                            logger.debug(f"跳过管理员模式词条: {key}")
-                            continue
-                        
-                        # 检查通配符匹配
-                        if "[n." in key:
-                            match_result = self.match_wildcard(key, text)
-                            if match_result:
-                                logger.info(f"通配符匹配成功: 词库={lid}, key='{key}', text='{text}'")
-                                return {
-                                    "type": "wildcard",
-                                    "response": random.choice(value["r"]),
-                                    "matches": match_result,
-                                    "lexicon_id": lid,
-                                    "item_index": idx,
-                                    "keyword": key
-                                }
-                        
-                        # 精确匹配
-                        if value.get("s") == 1 and key == text:
-                            logger.info(f"精确匹配成功: 词库={lid}, key='{key}', text='{text}'")
-                            return {
-                                "type": "exact",
-                                "response": random.choice(value["r"]),
-                                "lexicon_id": lid,
-                                "item_index": idx,
-                                "keyword": key
-                            }
-                        
-                        # 模糊匹配
-                        if value.get("s") == 0 and key in text:
-                            logger.info(f"模糊匹配成功: 词库={lid}, key='{key}', text='{text}'")
+                index = self._get_index(lid, lex_data)
+                if debug_enabled:
+                    logger.debug(f"检查词库 {lid}: 词条数={len(lex_data.get('work', []))}")
+
+                # 精确匹配：哈希表一次查找
+                hit = index["exact"].get(text)
+                if hit:
+                    logger.info(f"精确匹配成功: 词库={lid}, key='{text}'")
+                    return {
+                        "type": "exact",
+                        "responses": hit.responses,
+                        "lexicon_id": lid,
+                        "item_index": hit.idx,
+                        "keyword": text
+                    }
+
+                # 模糊匹配：自动机单次扫描文本（不可用时退回线性扫描）
+                automaton = index["automaton"]
+                if automaton is not None:
+                    found = next(automaton.iter(text), None)
+                    if found:
+                        entry = found[1]
+                        logger.info(f"模糊匹配成功: 词库={lid}, key='{entry.key}', text='{text}'")
+                        return {
+                            "type": "fuzzy",
+                            "responses": entry.responses,
+                            "lexicon_id": lid,
+                            "item_index": entry.idx,
+                            "keyword": entry.key
+                        }
+                else:
+                    # 布隆预检：消息不含任何词条三连字时跳过整个线性扫描
+                    fuzzy_bloom = index["fuzzy_bloom"]
+                    fuzzy_entries = index["fuzzy"] if (
+                        fuzzy_bloom is None or _bloom_maybe_contains(fuzzy_bloom, text)
+                    ) else ()
+                    for entry in fuzzy_entries:
+                        if entry.key in text:
+                            logger.info(f"模糊匹配成功: 词库={lid}, key='{entry.key}', text='{text}'")
                             return {
                                 "type": "fuzzy",
-                                "response": random.choice(value["r"]),
+                                "responses": entry.responses,
                                 "lexicon_id": lid,
-                                "item_index": idx,
-                                "keyword": key
+                                "item_index": entry.idx,
+                                "keyword": entry.key
                             }
+
+                # 通配符匹配
+                for entry in index["wildcards"]:
+                    # 检查管理员模式
+                    if entry.mode == 10 and not is_admin:
+                        if debug_enabled:
+                            logger.debug(f"跳过管理员模式词条: {entry.key}")
+                        continue
+                    match_result = self.match_wildcard(entry.key, text)
+                    if match_result:
+                        logger.info(f"通配符匹配成功: 词库={lid}, key='{entry.key}', text='{text}'")
+                        return {
+                            "type": "wildcard",
+                            "responses": entry.responses,
+                            "matches": match_result,
+                            "lexicon_id": lid,
+                            "item_index": entry.idx,
+                            "keyword": entry.key
+                        }
             except Exception as e:
                 logger.warning(f"搜索词库 {lid} 时出错: {e}")
                 continue
         
-        logger.debug(f"未找到匹配的关键词: '{text}'")
+        if debug_enabled:
+            logger.debug(f"未找到匹配的关键词: '{text}'")
         return None
 
     def match_wildcard(self, pattern: str, text: str) -> Optional[List[str]]:
         """通配符匹配"""
-        # 转义特殊字符
-        safe_pattern = re.escape(pattern)
-        # 将 [n.x] 替换为 (.+?)
-        safe_pattern = re.sub(r'\\\[n\\.(\d+)\\\]', r'(.+?)', safe_pattern)
+        cached = _compile_wildcard(pattern)
+        if cached is None:
+            return None
 
-        try:
-            match = re.match(f"^{safe_pattern}$", text)
-            if match:
-                groups = match.groups()
-                result = ["", "", "", "", "", ""]  # n.0 到 n.5
-                
-                # 获取所有占位符索引
-                placeholders = re.findall(r'\[n\.(\d+)\]', pattern)
-                for idx, ph in enumerate(placeholders):
-                    ph_idx = int(ph)
-                    if ph_idx < len(result) and idx < len(groups):
-                        result[ph_idx] = groups[idx]
-                return result
-        except re.error as e:
-            logger.error(f"正则匹配错误: {e}")
+        compiled, placeholders = cached
+        match = compiled.match(text)
+        if match:
+            groups = match.groups()
+            result = [""] * 6  # n.0 到 n.5
+            for idx, ph_idx in enumerate(placeholders):
+                if ph_idx < 6 and idx < len(groups):
+                    result[ph_idx] = groups[idx]
+            return result
 
         return None
 
@@ -679,93 +1230,77 @@ class KeywordManager:
 
         text = base_response
 
-        # 替换通配符
-        if matches:
-            for i in range(1, 6):
-                if i < len(matches) and matches[i]:
-                    text = text.replace(f"[n.{i}]", matches[i])
-                    # 清理通配符内容，只保留安全字符
-                    clean_match = re.search(r'[\d\w/.:?=&-]+', matches[i])
-                    if clean_match:
-                        text = text.replace(f"[n.{i}.t]", clean_match.group())
-
         # 获取发送者信息 - 使用AstrBot标准API
         group_id = event.get_group_id() or ""
         sender_id = str(event.get_sender_id())
-        
+
         # 使用 event.get_sender_name() 获取发送者名称
         sender_name = event.get_sender_name() or sender_id
-        
-        # 替换用户变量
-        text = text.replace("[qq]", sender_id)
-        text = text.replace("[group]", str(group_id))
-        text = text.replace("[name]", sender_name)
-        text = text.replace("[card]", sender_name)
-        
+
         # 获取机器人ID
         try:
-            bot_id = event.self_id  # 通用属性
-            text = text.replace("[ai]", str(bot_id))
+            bot_id = str(event.self_id)  # 通用属性
         except AttributeError:
             # 备选方法
-            try:
-                bot_id = event.bot_id if hasattr(event, 'bot_id') else "unknown"
-                text = text.replace("[ai]", str(bot_id))
-            except:
-                text = text.replace("[ai]", "unknown")
+            bot_id = str(event.bot_id) if hasattr(event, 'bot_id') else "unknown"
 
         # 消息ID - 使用 message_obj 属性
         try:
             message_id = str(event.message_obj.message_id)
-            text = text.replace("[id]", message_id)
-            text = text.replace("[消息id]", message_id)
         except AttributeError:
+            message_id = None
             logger.warning("无法获取消息ID，跳过 [id] 和 [消息id] 变量替换")
 
-        # 处理随机数
-        while True:
-            match = re.search(r'\((\d+)-(\d+)\)', text)
-            if not match:
-                break
-            min_val = int(match.group(1))
-            max_val = int(match.group(2))
-            rand_num = random.randint(min_val, max_val)
-            text = text.replace(match.group(0), str(rand_num), 1)
-
-        # 处理时间变量
-        now = datetime.now()
-        time_replacements = {
-            r'\(Y\)': str(now.year),
-            r'\(M\)': str(now.month),
-            r'\(D\)': str(now.day),
-            r'\(h\)': str(now.hour),
-            r'\(m\)': str(now.minute),
-            r'\(s\)': str(now.second)
+        # 一次扫描同时填充通配符和用户变量（[n.i.t] 只保留安全字符）
+        var_map = {
+            "qq": sender_id,
+            "group": str(group_id),
+            "name": sender_name,
+            "card": sender_name,
+            "ai": bot_id,
+            "id": message_id,
+            "消息id": message_id
         }
 
-        for pattern, replacement in time_replacements.items():
-            text = re.sub(pattern, replacement, text)
+        def _fill_placeholder(m):
+            var = m.group(3)
+            if var is not None:
+                value = var_map[var]
+                return value if value is not None else m.group(0)
+            i = int(m.group(1))
+            if matches and i < len(matches) and matches[i]:
+                if m.group(2):
+                    clean_match = _MATCH_CLEAN_RE.search(matches[i])
+                    return clean_match.group() if clean_match else m.group(0)
+                return matches[i]
+            return m.group(0)
+
+        text = _PLACEHOLDER_RE.sub(_fill_placeholder, text)
+
+        # 处理随机数（单次回调替换，避免反复整串扫描）
+        text = _RAND_RE.sub(
+            lambda m: str(random.randint(int(m.group(1)), int(m.group(2)))),
+            text
+        )
+
+        # 处理时间变量（无 '(' 时直接跳过正则，字符串按秒缓存）
+        if '(' in text:
+            time_vals = _time_strings()
+            text = _TIME_RE.sub(lambda m: time_vals[m.group(1)], text)
 
-        # 安全处理计算表达式
-        while True:
-            match = re.search(r'\(\+([^\)]+)\)', text)
-            if not match:
-                break
-            expr = match.group(1)
+        # 安全处理计算表达式（求值失败保留原文）
+        def _calc(m):
             try:
-                # 使用安全求值器
-                result = self.math_evaluator.evaluate(expr)
-                if result is not None:
-                    text = text.replace(match.group(0), str(result), 1)
-                else:
-                    # 求值失败，保留原表达式
-                    break
+                result = self.math_evaluator.evaluate(m.group(1))
             except Exception as e:
-                logger.error(f"数学表达式求值异常: {expr}, 错误: {e}")
-                break
+                logger.error(f"数学表达式求值异常: {m.group(1)}, 错误: {e}")
+                return m.group(0)
+            return str(result) if result is not None else m.group(0)
+
+        text = _EXPR_RE.sub(_calc, text)
 
         # 处理条件判断
-        match_compare = re.search(r'\{(.*?)([><=])(.*?)\}', text)
+        match_compare = _COND_RE.search(text)
         if match_compare:
             a = match_compare.group(1)
             op = match_compare.group(2)
@@ -773,8 +1308,15 @@ class KeywordManager:
             result = False
 
             try:
-                a_val = int(a) if a.isdigit() else a
-                b_val = int(b) if b.isdigit() else b
+                # 直接尝试转数字，失败则按字符串比较，省去isdigit的二次扫描
+                try:
+                    a_val: Union[int, str] = int(a)
+                except ValueError:
+                    a_val = a
+                try:
+                    b_val: Union[int, str] = int(b)
+                except ValueError:
+                    b_val = b
 
                 if op == '>':
                     result = a_val > b_val
@@ -782,93 +1324,107 @@ class KeywordManager:
                     result = a_val < b_val
                 elif op == '=':
                     result = str(a_val) == str(b_val)
-            except ValueError:
+            except TypeError:
                 result = False
 
             if result:
-                text = re.sub(r'\{.*?[><=].*?\}', '', text)
+                text = _COND_RE.sub('', text)
             else:
                 return None
 
         # 解析特殊命令
         return await self.parse_special_commands(text, event)
 
+    def _emit_image(self, cmd_parts: List[str], part: str, event: AstrMessageEvent, chain: List):
+        """[图片.url] 消息段"""
+        url = '.'.join(cmd_parts[1:])
+        if url.startswith(('http://', 'https://')):
+            try:
+                chain.append(Image.fromURL(url))
+            except Exception as e:
+                logger.error(f"加载图片失败: {url}, 错误: {e}")
+                chain.append(Plain(f"[图片加载失败: {url}]"))
+        else:
+            try:
+                # 相对于插件数据目录的文件（解析结果按LRU缓存）
+                file_path = self._filecache_paths.get(url)
+                if file_path is None:
+                    file_path = str(self.data_dir / "filecache" / url)
+                    self._filecache_paths[url] = file_path
+                    if len(self._filecache_paths) > self._filecache_paths_max:
+                        self._filecache_paths.popitem(last=False)
+                else:
+                    self._filecache_paths.move_to_end(url)
+                chain.append(Image.fromFileSystem(file_path))
+            except Exception as e:
+                logger.error(f"加载本地图片失败: {url}, 错误: {e}")
+                chain.append(Plain(f"[本地图片加载失败: {url}]"))
+
+    def _emit_at(self, cmd_parts: List[str], part: str, event: AstrMessageEvent, chain: List):
+        """[艾特.QQ号] 消息段"""
+        if cmd_parts[1]:
+            chain.append(At(qq=cmd_parts[1]))
+        else:
+            chain.append(At(qq=str(event.get_sender_id())))
+
+    def _emit_face(self, cmd_parts: List[str], part: str, event: AstrMessageEvent, chain: List):
+        """[表情.id] 消息段"""
+        if cmd_parts[1]:
+            chain.append(Face(id=cmd_parts[1]))
+
+    def _emit_reply(self, cmd_parts: List[str], part: str, event: AstrMessageEvent, chain: List):
+        """[回复.消息id] 消息段"""
+        if cmd_parts[1]:
+            chain.append(Reply(message_id=cmd_parts[1]))
+        else:
+            # 使用 event.message_obj 获取消息ID
+            try:
+                chain.append(Reply(message_id=event.message_obj.message_id))
+            except AttributeError:
+                logger.warning("无法获取消息ID，跳过回复消息段")
+                chain.append(Plain("[回复]"))
+
+    def _emit_record(self, cmd_parts: List[str], part: str, event: AstrMessageEvent, chain: List):
+        """[语音.url] 消息段"""
+        url = '.'.join(cmd_parts[1:])
+        try:
+            chain.append(Record(file=url))
+        except Exception as e:
+            logger.error(f"加载语音失败: {url}, 错误: {e}")
+            chain.append(Plain(f"[语音加载失败: {url}]"))
+
+    def _emit_poke(self, cmd_parts: List[str], part: str, event: AstrMessageEvent, chain: List):
+        """[poke.QQ号.x] 消息段"""
+        if len(cmd_parts) >= 3:
+            chain.append(Poke(qq=cmd_parts[1]))
+
     async def parse_special_commands(self, text: str, event: AstrMessageEvent) -> List[BaseMessageComponent]:
         """解析特殊命令，返回消息组件列表"""
         chain = []
 
-        parts = re.split(r'(\[.*?\])', text)
-
-        for part in parts:
-            if not part.strip():
-                continue
+        # 单次扫描：交替输出普通文本段和 [命令] 段，不构造中间列表
+        prev = 0
+        for cmd_match in _CMD_RE.finditer(text):
+            plain_part = text[prev:cmd_match.start()]
+            if plain_part.strip():
+                chain.append(Plain(plain_part))
+            prev = cmd_match.end()
+
+            part = cmd_match.group(0)
+            cmd = cmd_match.group(1)
+            cmd_parts = cmd.split('.')
+
+            if len(cmd_parts) >= 2:
+                handler = self._cmd_dispatch.get(cmd_parts[0].lower())
+                if handler:
+                    handler(cmd_parts, part, event, chain)
+                else:
+                    chain.append(Plain(part))
 
-            if part.startswith('[') and part.endswith(']'):
-                cmd = part[1:-1]
-                cmd_parts = cmd.split('.')
-
-                if len(cmd_parts) >= 2:
-                    cmd_type = cmd_parts[0].lower()
-
-                    if cmd_type in ["image", "图片"]:
-                        url = '.'.join(cmd_parts[1:])
-                        if url.startswith(('http://', 'https://')):
-                            try:
-                                chain.append(Image.fromURL(url))
-                            except Exception as e:
-                                logger.error(f"加载图片失败: {url}, 错误: {e}")
-                                chain.append(Plain(f"[图片加载失败: {url}]"))
-                        else:
-                            try:
-                                # 相对于插件数据目录的文件
-                                file_path = self.data_dir / "filecache" / url
-                                chain.append(Image.fromFileSystem(str(file_path)))
-                            except Exception as e:
-                                logger.error(f"加载本地图片失败: {url}, 错误: {e}")
-                                chain.append(Plain(f"[本地图片加载失败: {url}]"))
-
-                    elif cmd_type in ["at", "艾特"]:
-                        if len(cmd_parts) >= 2 and cmd_parts[1]:
-                            qq = cmd_parts[1]
-                            chain.append(At(qq=qq))
-                        else:
-                            chain.append(At(qq=str(event.get_sender_id())))
-
-                    elif cmd_type in ["face", "表情"]:
-                        if len(cmd_parts) >= 2 and cmd_parts[1]:
-                            face_id = cmd_parts[1]
-                            chain.append(Face(id=face_id))
-
-                    elif cmd_type in ["reply", "回复"]:
-                        if len(cmd_parts) >= 2 and cmd_parts[1]:
-                            msg_id = cmd_parts[1]
-                            chain.append(Reply(message_id=msg_id))
-                        else:
-                            # 使用 event.message_obj 获取消息ID
-                            try:
-                                msg_id = event.message_obj.message_id
-                                chain.append(Reply(message_id=msg_id))
-                            except AttributeError:
-                                logger.warning("无法获取消息ID，跳过回复消息段")
-                                chain.append(Plain("[回复]"))
-
-                    elif cmd_type in ["record", "语音"]:
-                        url = '.'.join(cmd_parts[1:])
-                        try:
-                            chain.append(Record(file=url))
-                        except Exception as e:
-                            logger.error(f"加载语音失败: {url}, 错误: {e}")
-                            chain.append(Plain(f"[语音加载失败: {url}]"))
-
-                    elif cmd_type == "poke":
-                        if len(cmd_parts) >= 3:
-                            target_id = cmd_parts[1]
-                            chain.append(Poke(qq=target_id))
-
-                    else:
-                        chain.append(Plain(part))
-            else:
-                chain.append(Plain(part))
+        # 末尾剩余的普通文本
+        tail = text[prev:]
+        if tail.strip():
+            chain.append(Plain(tail))
 
         return chain
 
@@ -878,19 +1434,18 @@ class KeywordManager:
         lexicon_id = self.get_lexicon_id(group_id, user_id)
         lexicon = await self.get_lexicon(lexicon_id, "")
 
-        # 检查词条是否已存在
-        for item in lexicon["work"]:
-            if keyword in item:
-                return False, "词条已存在"
+        # 检查词条是否已存在（O(1)哈希查找）
+        by_key = self._get_by_key(lexicon_id, lexicon)
+        if keyword in by_key:
+            return False, "词条已存在"
 
-        # 容错处理
+        # 容错处理（单次translate替代7个链式replace）
         if self.config.get("mistake_turn_type", False):
-            keyword = (keyword.replace('【', '[').replace('】', ']')
-                      .replace('（', '(').replace('）', ')')
-                      .replace('｛', '{').replace('｝', '}').replace('：', ':'))
+            keyword = keyword.translate(_FULLWIDTH_TABLE)
 
-        new_item = {keyword: {"r": [response], "s": mode}}
-        lexicon["work"].append(new_item)
+        new_value = {"r": [response], "s": mode}
+        lexicon["work"].append({keyword: new_value})
+        by_key.setdefault(keyword, (len(lexicon["work"]) - 1, new_value))
 
         await self.save_lexicon(lexicon_id, lexicon)
         return True, "添加成功"
@@ -900,12 +1455,14 @@ class KeywordManager:
         lexicon_id = self.get_lexicon_id(group_id, user_id)
         lexicon = await self.get_lexicon(lexicon_id, "")
 
-        new_work = [item for item in lexicon["work"] if keyword not in item]
-
-        if len(new_work) == len(lexicon["work"]):
+        # O(1)定位词条下标，免去整表过滤重建
+        hit = self._get_by_key(lexicon_id, lexicon).get(keyword)
+        if hit is None:
             return False, "词条不存在"
 
-        lexicon["work"] = new_work
+        del lexicon["work"][hit[0]]
+        # 下标整体偏移，变更索引失效
+        self._by_key.pop(lexicon_id, None)
         await self.save_lexicon(lexicon_id, lexicon)
         return True, "删除成功"
 
@@ -914,46 +1471,48 @@ class KeywordManager:
         lexicon_id = self.get_lexicon_id(group_id, user_id)
         lexicon = await self.get_lexicon(lexicon_id, "")
 
-        for item in lexicon["work"]:
-            if keyword in item:
-                item[keyword]["r"].append(response)
-                await self.save_lexicon(lexicon_id, lexicon)
-                return True, "添加成功"
+        hit = self._get_by_key(lexicon_id, lexicon).get(keyword)
+        if hit is None:
+            return False, "词条不存在"
 
-        return False, "词条不存在"
+        hit[1]["r"].append(response)
+        await self.save_lexicon(lexicon_id, lexicon)
+        return True, "添加成功"
 
     async def remove_response(self, group_id: str, user_id: str, keyword: str, response: str) -> Tuple[bool, str]:
         """删除关键词的某个回复选项"""
         lexicon_id = self.get_lexicon_id(group_id, user_id)
         lexicon = await self.get_lexicon(lexicon_id, "")
 
-        for item in lexicon["work"]:
-            if keyword in item and response in item[keyword]["r"]:
-                item[keyword]["r"].remove(response)
-                if not item[keyword]["r"]:
-                    lexicon["work"].remove(item)
-                await self.save_lexicon(lexicon_id, lexicon)
-                return True, "删除成功"
+        hit = self._get_by_key(lexicon_id, lexicon).get(keyword)
+        if hit is None:
+            return False, "词条或回复不存在"
 
-        return False, "词条或回复不存在"
+        i, value = hit
+        try:
+            # 单次扫描删除，省去先in后remove的双重遍历
+            value["r"].remove(response)
+        except ValueError:
+            return False, "词条或回复不存在"  # 词条存在但回复不存在
+
+        if not value["r"]:
+            del lexicon["work"][i]
+            # 下标整体偏移，变更索引失效
+            self._by_key.pop(lexicon_id, None)
+        await self.save_lexicon(lexicon_id, lexicon)
+        return True, "删除成功"
 
     async def list_keywords(self, group_id: str, user_id: str, keyword_filter: str = "") -> List[str]:
         """列出关键词"""
         lexicon_id = self.get_lexicon_id(group_id, user_id)
         lexicon = await self.get_lexicon(lexicon_id, "")
 
-        results = []
-        for idx, item in enumerate(lexicon["work"]):
-            for key, value in item.items():
-                if not keyword_filter or keyword_filter in key:
-                    mode_str = {
-                        0: "模糊",
-                        1: "精准",
-                        10: "管理"
-                    }.get(value["s"], "未知")
-                    results.append(f"{idx+1}. {key} ({mode_str}) - {len(value['r'])}个回复")
-
-        return results
+        return [
+            f"{idx+1}. {key} ({_MODE_STR.get(value['s'], '未知')}) - {len(value['r'])}个回复"
+            for idx, item in enumerate(lexicon["work"])
+            for key, value in item.items()
+            if not keyword_filter or keyword_filter in key
+        ]
 
     async def get_keyword_detail(self, group_id: str, user_id: str, keyword_id: int) -> Optional[Dict]:
         """获取关键词详情"""
@@ -962,7 +1521,7 @@ class KeywordManager:
 
         if 1 <= keyword_id <= len(lexicon["work"]):
             item = lexicon["work"][keyword_id-1]
-            key = list(item.keys())[0]
+            key = next(iter(item))
             return {
                 "keyword": key,
                 "responses": item[key]["r"],
@@ -978,9 +1537,22 @@ class KeywordPlugin(Star):
         super().__init__(context)
         self.config = config
         self.keyword_manager = None
-        self.admin_ids = set()
-        self.ignore_groups = set()
-        self.ignore_users = set()
+        self.admin_ids = frozenset()
+        self.ignore_groups = frozenset()
+        self.ignore_users = frozenset()
+        # 管理指令分发表：带参指令按正则命令词分发，无参指令按整条消息分发
+        self._admin_arg_dispatch = {
+            "精准问答": self._admin_add_exact,
+            "模糊问答": self._admin_add_fuzzy,
+            "加选项": self._admin_add_response,
+            "删词": self._admin_remove_keyword,
+            "查词": self._admin_list_keywords,
+            "切换词库": self._admin_switch_lexicon,
+        }
+        self._admin_plain_dispatch = {
+            "词库清空": self._admin_clear_lexicon,
+            "词库备份": self._admin_backup_lexicon,
+        }
 
     async def initialize(self):
         logger.info("Van词库插件正在初始化...")
@@ -993,20 +1565,31 @@ class KeywordPlugin(Star):
         logger.info("Van词库插件初始化完成")
 
     def parse_config(self):
-        """解析配置"""
+        """解析配置（ID做intern，热路径成员检查先比指针再比内容）"""
         admin_text = self.config.get("admin_ids", "")
-        self.admin_ids = set(line.strip() for line in admin_text.split('\n') if line.strip())
+        self.admin_ids = frozenset(sys.intern(line.strip()) for line in admin_text.split('\n') if line.strip())
 
         ignore_groups_text = self.config.get("ignore_group_ids", "")
-        self.ignore_groups = set(line.strip() for line in ignore_groups_text.split('\n') if line.strip())
+        self.ignore_groups = frozenset(sys.intern(line.strip()) for line in ignore_groups_text.split('\n') if line.strip())
 
         ignore_users_text = self.config.get("ignore_user_ids", "")
-        self.ignore_users = set(line.strip() for line in ignore_users_text.split('\n') if line.strip())
+        self.ignore_users = frozenset(sys.intern(line.strip()) for line in ignore_users_text.split('\n') if line.strip())
         
         logger.info(f"管理员列表: {self.admin_ids}")
         logger.info(f"忽略群组: {self.ignore_groups}")
         logger.info(f"忽略用户: {self.ignore_users}")
 
+    def _is_self(self, event: AstrMessageEvent) -> bool:
+        """判断消息是否由机器人自身发出（多平台下各适配器self_id不同，逐事件比较）"""
+        try:
+            bot_id = event.self_id  # 通用属性
+        except AttributeError:
+            # 备选方法；都取不到则继续处理消息
+            bot_id = getattr(event, 'bot_id', None)
+            if bot_id is None:
+                return False
+        return str(event.get_sender_id()) == str(bot_id)
+
     def is_admin(self, user_id: str) -> bool:
         """检查是否为管理员"""
         return user_id in self.admin_ids
@@ -1025,45 +1608,43 @@ class KeywordPlugin(Star):
     async def handle_group_message(self, event: AstrMessageEvent):
         """处理群聊消息"""
         # 过滤自身消息
-        try:
-            bot_id = event.self_id  # 通用属性
-            sender_id = event.get_sender_id()
-            if str(sender_id) == str(bot_id):
-                logger.debug(f"忽略自身消息: sender_id={sender_id}, bot_id={bot_id}")
-                return
-        except AttributeError:
-            # 如果 event 没有 self_id 属性，尝试其他方法
-            try:
-                bot_id = event.bot_id if hasattr(event, 'bot_id') else None
-                sender_id = event.get_sender_id()
-                if bot_id and str(sender_id) == str(bot_id):
-                    logger.debug(f"忽略自身消息 (备用方法): sender_id={sender_id}, bot_id={bot_id}")
-                    return
-            except:
-                pass  # 如果无法获取，继续处理
+        if self._is_self(event):
+            logger.debug(f"忽略自身消息: sender_id={event.get_sender_id()}")
+            return
         
-        group_id = str(event.get_group_id() or "")
-        user_id = str(event.get_sender_id())
+        # intern后对配置名单的成员检查可先走指针比较
+        group_id = sys.intern(str(event.get_group_id() or ""))
+        user_id = sys.intern(str(event.get_sender_id()))
 
         logger.debug(f"收到群聊消息: group={group_id}, user={user_id}")
 
-        if self.should_ignore(group_id, user_id):
+        # 名单检查内联到主路径，每条消息只做集合查找，不再经过方法调用
+        if group_id and group_id in self.ignore_groups:
             return
+        if user_id in self.ignore_users:
+            return
+        is_admin = user_id in self.admin_ids
 
         message_text = event.message_str.strip()
+        if not message_text:
+            return
 
         # 先检查是否为管理员指令
-        if self.is_admin(user_id):
-            handled = await self.handle_admin_command(message_text, event)
+        if is_admin:
+            handled = await self.handle_admin_command(message_text, event, group_id, user_id)
             if handled:
                 return
 
+        # 超长文本不做关键词匹配，避免病态消息拖垮匹配路径
+        if len(message_text) > self.config.get("max_match_len", 2000):
+            return
+
         # 关键词匹配
         result = await self.keyword_manager.search_keyword(
             message_text,
             group_id,
             user_id,
-            self.is_admin(user_id)
+            is_admin
         )
 
         if result:
@@ -1077,8 +1658,8 @@ class KeywordPlugin(Star):
                 user_id, lexicon_id, item_index
             )
 
-            # cooling 为 False 表示没有冷却，为 int 表示剩余秒数
-            if isinstance(cooling, int) and cooling > 0:
+            # cooling 为剩余秒数，0 表示没有冷却
+            if cooling > 0:
                 cooling_msg = f"冷却中，请等待 {cooling} 秒"
                 logger.debug(f"触发冷却: {cooling_msg}")
                 yield event.plain_result(cooling_msg)
@@ -1092,13 +1673,11 @@ class KeywordPlugin(Star):
                 yield event.chain_result(response_chain)
                 
                 # 处理冷却时间设置
-                cooling_match = re.search(r'\((\d+)~\)', result.get("response", ""))
+                cooling_match = _COOLING_RE.search(result.get("response", ""))
                 if cooling_match:
                     seconds = int(cooling_match.group(1))
                     if seconds == 0:
-                        tomorrow = datetime.now() + timedelta(days=1)
-                        tomorrow_midnight = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
-                        seconds = int(tomorrow_midnight.timestamp() - datetime.now().timestamp())
+                        seconds = _seconds_until_midnight()
                     
                     await self.keyword_manager.cooling_manager.set_cooling(
                         user_id, lexicon_id, item_index, seconds
@@ -1109,43 +1688,39 @@ class KeywordPlugin(Star):
     async def handle_private_message(self, event: AstrMessageEvent):
         """处理私聊消息"""
         # 过滤自身消息
-        try:
-            bot_id = event.self_id  # 通用属性
-            sender_id = event.get_sender_id()
-            if str(sender_id) == str(bot_id):
-                logger.debug(f"忽略自身消息: sender_id={sender_id}, bot_id={bot_id}")
-                return
-        except AttributeError:
-            # 如果 event 没有 self_id 属性，尝试其他方法
-            try:
-                bot_id = event.bot_id if hasattr(event, 'bot_id') else None
-                sender_id = event.get_sender_id()
-                if bot_id and str(sender_id) == str(bot_id):
-                    logger.debug(f"忽略自身消息 (备用方法): sender_id={sender_id}, bot_id={bot_id}")
-                    return
-            except:
-                pass  # 如果无法获取，继续处理
+        if self._is_self(event):
+            logger.debug(f"忽略自身消息: sender_id={event.get_sender_id()}")
+            return
         
-        user_id = str(event.get_sender_id())
+        # intern后对配置名单的成员检查可先走指针比较
+        user_id = sys.intern(str(event.get_sender_id()))
         logger.debug(f"收到私聊消息: user={user_id}")
 
-        if self.should_ignore("", user_id):
+        # 名单检查内联到主路径，每条消息只做集合查找，不再经过方法调用
+        if user_id in self.ignore_users:
             return
+        is_admin = user_id in self.admin_ids
 
         message_text = event.message_str.strip()
+        if not message_text:
+            return
 
         # 私聊也支持管理员指令
-        if self.is_admin(user_id):
-            handled = await self.handle_admin_command(message_text, event)
+        if is_admin:
+            handled = await self.handle_admin_command(message_text, event, "", user_id)
             if handled:
                 return
 
+        # 超长文本不做关键词匹配，避免病态消息拖垮匹配路径
+        if len(message_text) > self.config.get("max_match_len", 2000):
+            return
+
         # 私聊关键词匹配
         result = await self.keyword_manager.search_keyword(
             message_text,
             "",  # 私聊没有群组ID
             user_id,
-            self.is_admin(user_id)
+            is_admin
         )
 
         if result:
@@ -1159,8 +1734,8 @@ class KeywordPlugin(Star):
                 user_id, lexicon_id, item_index
             )
 
-            # cooling 为 False 表示没有冷却，为 int 表示剩余秒数
-            if isinstance(cooling, int) and cooling > 0:
+            # cooling 为剩余秒数，0 表示没有冷却
+            if cooling > 0:
                 cooling_msg = f"冷却中，请等待 {cooling} 秒"
                 logger.debug(f"私聊触发冷却: {cooling_msg}")
                 yield event.plain_result(cooling_msg)
@@ -1174,138 +1749,148 @@ class KeywordPlugin(Star):
                 yield event.chain_result(response_chain)
                 
                 # 处理冷却时间设置
-                cooling_match = re.search(r'\((\d+)~\)', result.get("response", ""))
+                cooling_match = _COOLING_RE.search(result.get("response", ""))
                 if cooling_match:
                     seconds = int(cooling_match.group(1))
                     if seconds == 0:
-                        tomorrow = datetime.now() + timedelta(days=1)
-                        tomorrow_midnight = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
-                        seconds = int(tomorrow_midnight.timestamp() - datetime.now().timestamp())
+                        seconds = _seconds_until_midnight()
                 
                     await self.keyword_manager.cooling_manager.set_cooling(
                         user_id, lexicon_id, item_index, seconds
                     )
                     logger.debug(f"设置私聊冷却时间: {seconds}秒")
 
-    async def handle_admin_command(self, message: str, event: AstrMessageEvent) -> bool:
-        """处理管理员指令，返回是否处理成功"""
-        group_id = str(event.get_group_id() or "")
-        user_id = str(event.get_sender_id())
+    async def handle_admin_command(self, message: str, event: AstrMessageEvent,
+                                   group_id: str, user_id: str) -> bool:
+        """处理管理员指令，返回是否处理成功（ID由调用方算好传入）"""
+        # 前缀预筛：管理员的普通聊天消息一次比较直接出局
+        if not message.startswith(_ADMIN_PREFIXES):
+            return False
 
         logger.debug(f"检查管理员指令: {message}")
 
-        # 精准问答
-        if message.startswith("精准问答 "):
-            parts = message[4:].strip().split(maxsplit=2)
-            if len(parts) >= 2:
-                keyword = parts[0]
-                response = parts[1]
-                success, msg = await self.keyword_manager.add_keyword(
-                    group_id, user_id, keyword, response, 1
-                )
-                await event.send(event.plain_result(msg))
-                return True
-
-        # 模糊问答
-        elif message.startswith("模糊问答 "):
-            parts = message[4:].strip().split(maxsplit=2)
-            if len(parts) >= 2:
-                keyword = parts[0]
-                response = parts[1]
-                success, msg = await self.keyword_manager.add_keyword(
-                    group_id, user_id, keyword, response, 0
-                )
-                await event.send(event.plain_result(msg))
-                return True
-
-        # 加选项
-        elif message.startswith("加选项 "):
-            parts = message[3:].strip().split(maxsplit=2)
-            if len(parts) >= 2:
-                keyword = parts[0]
-                response = parts[1]
-                success, msg = await self.keyword_manager.add_response(
-                    group_id, user_id, keyword, response
-                )
-                await event.send(event.plain_result(msg))
-                return True
-
-        # 删词
-        elif message.startswith("删词 "):
-            keyword = message[2:].strip()
-            if keyword:
-                success, msg = await self.keyword_manager.remove_keyword(
-                    group_id, user_id, keyword
-                )
-                await event.send(event.plain_result(msg))
-                return True
-
-        # 查词
-        elif message.startswith("查词 "):
-            keyword = message[2:].strip()
-            keywords = await self.keyword_manager.list_keywords(
-                group_id, user_id, keyword
-            )
+        # 无参指令：整条消息精确匹配
+        handler = self._admin_plain_dispatch.get(message)
+        if handler is not None:
+            return await handler(event, group_id, user_id)
+
+        # 带参指令：单次正则匹配出命令词和参数，再查表分发
+        m = _ADMIN_CMD_RE.match(message)
+        if m is None:
+            return False
+        return await self._admin_arg_dispatch[m.group(1)](m.group(2), event, group_id, user_id)
+
+    async def _admin_add_keyword(self, arg: str, event: AstrMessageEvent,
+                                 group_id: str, user_id: str, mode: int) -> bool:
+        """精准问答/模糊问答 关键词 回复"""
+        parts = arg.strip().split(maxsplit=2)
+        if len(parts) < 2:
+            return False
+        success, msg = await self.keyword_manager.add_keyword(
+            group_id, user_id, parts[0], parts[1], mode
+        )
+        await event.send(event.plain_result(msg))
+        return True
+
+    async def _admin_add_exact(self, arg: str, event: AstrMessageEvent,
+                               group_id: str, user_id: str) -> bool:
+        return await self._admin_add_keyword(arg, event, group_id, user_id, 1)
+
+    async def _admin_add_fuzzy(self, arg: str, event: AstrMessageEvent,
+                               group_id: str, user_id: str) -> bool:
+        return await self._admin_add_keyword(arg, event, group_id, user_id, 0)
+
+    async def _admin_add_response(self, arg: str, event: AstrMessageEvent,
+                                  group_id: str, user_id: str) -> bool:
+        """加选项 关键词 回复"""
+        parts = arg.strip().split(maxsplit=2)
+        if len(parts) < 2:
+            return False
+        success, msg = await self.keyword_manager.add_response(
+            group_id, user_id, parts[0], parts[1]
+        )
+        await event.send(event.plain_result(msg))
+        return True
+
+    async def _admin_remove_keyword(self, arg: str, event: AstrMessageEvent,
+                                    group_id: str, user_id: str) -> bool:
+        """删词 关键词"""
+        keyword = arg.strip()
+        if not keyword:
+            return False
+        success, msg = await self.keyword_manager.remove_keyword(
+            group_id, user_id, keyword
+        )
+        await event.send(event.plain_result(msg))
+        return True
+
+    async def _admin_list_keywords(self, arg: str, event: AstrMessageEvent,
+                                   group_id: str, user_id: str) -> bool:
+        """查词 关键词"""
+        keywords = await self.keyword_manager.list_keywords(
+            group_id, user_id, arg.strip()
+        )
 
-            if keywords:
-                result = "关键词列表：\n" + "\n".join(keywords[:20])
-                if len(keywords) > 20:
-                    result += f"\n...还有 {len(keywords)-20} 个词条"
-            else:
-                result = "未找到相关关键词"
+        if keywords:
+            result = "关键词列表：\n" + "\n".join(keywords[:20])
+            if len(keywords) > 20:
+                result += f"\n...还有 {len(keywords)-20} 个词条"
+        else:
+            result = "未找到相关关键词"
 
-            await event.send(event.plain_result(result))
-            return True
+        await event.send(event.plain_result(result))
+        return True
 
-        # 词库清空（私聊使用）
-        elif message == "词库清空":
-            lexicon_id = self.keyword_manager.get_lexicon_id(group_id, user_id)
-            await self.keyword_manager.save_lexicon(lexicon_id, {"work": []})
-            await event.send(event.plain_result("词库已清空"))
-            return True
+    async def _admin_clear_lexicon(self, event: AstrMessageEvent,
+                                   group_id: str, user_id: str) -> bool:
+        """词库清空（私聊使用）"""
+        lexicon_id = self.keyword_manager.get_lexicon_id(group_id, user_id)
+        await self.keyword_manager.save_lexicon(lexicon_id, {"work": []})
+        await event.send(event.plain_result("词库已清空"))
+        return True
+
+    async def _do_backup(self, lexicon_id: str) -> Tuple[bool, str, Optional[Path]]:
+        """备份指定词库文件，返回 (是否成功, 提示信息, 备份路径)"""
+        # 备份前先把防抖中的改动落盘，避免备份到旧数据
+        await self.keyword_manager.force_flush(lexicon_id)
+        lexicon_path = StarTools.get_data_dir() / "lexicon" / f"{lexicon_id}.json"
 
-        # 词库备份
-        elif message == "词库备份":
-            lexicon_id = self.keyword_manager.get_lexicon_id(group_id, user_id)
-            lexicon_path = StarTools.get_data_dir() / "lexicon" / f"{lexicon_id}.json"
-            
-            if await aos.path.exists(lexicon_path):
-                backup_dir = StarTools.get_data_dir() / "backups"
-                await aos.makedirs(backup_dir, exist_ok=True)
-                
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_path = backup_dir / f"{lexicon_id}_{timestamp}.json"
-                
-                try:
-                    async with aiofiles.open(lexicon_path, 'r', encoding='utf-8') as src:
-                        async with aiofiles.open(backup_path, 'w', encoding='utf-8') as dst:
-                            await dst.write(await src.read())
-                    
-                    await event.send(event.plain_result(f"词库备份成功：{backup_path.name}"))
-                except Exception as e:
-                    logger.error(f"备份词库失败: {e}")
-                    await event.send(event.plain_result("备份失败，请查看日志"))
-            else:
-                await event.send(event.plain_result("词库文件不存在"))
-            return True
+        if not await aos.path.exists(lexicon_path):
+            return False, "词库文件不存在", None
 
-        # 切换词库
-        elif message.startswith("切换词库 "):
-            lexicon_name = message[5:].strip()
-            if lexicon_name:
-                self.keyword_manager.select_config[user_id] = lexicon_name
-                select_path = StarTools.get_data_dir() / "select.txt"
-                lines = [f"{k}={v}" for k, v in self.keyword_manager.select_config.items()]
-                try:
-                    async with aiofiles.open(select_path, 'w', encoding='utf-8') as f:
-                        await f.write('\n'.join(lines))
-                    await event.send(event.plain_result(f"已切换到词库: {lexicon_name}"))
-                except Exception as e:
-                    logger.error(f"保存选择配置失败: {e}")
-                    await event.send(event.plain_result("切换失败，请查看日志"))
-            return True
+        backup_dir = StarTools.get_data_dir() / "backups"
+        await aos.makedirs(backup_dir, exist_ok=True)
 
-        return False
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_path = backup_dir / f"{lexicon_id}_{timestamp}.json"
+
+        try:
+            await _copy_file(lexicon_path, backup_path)
+        except Exception as e:
+            logger.error(f"备份词库失败: {e}")
+            return False, "备份失败，请查看日志", None
+
+        return True, f"词库备份成功：{backup_path.name}", backup_path
+
+    async def _admin_backup_lexicon(self, event: AstrMessageEvent,
+                                    group_id: str, user_id: str) -> bool:
+        """词库备份"""
+        lexicon_id = self.keyword_manager.get_lexicon_id(group_id, user_id)
+        ok, msg, _ = await self._do_backup(lexicon_id)
+        await event.send(event.plain_result(msg))
+        return True
+
+    async def _admin_switch_lexicon(self, arg: str, event: AstrMessageEvent,
+                                    group_id: str, user_id: str) -> bool:
+        """切换词库 词库名"""
+        lexicon_name = arg.strip()
+        if lexicon_name:
+            self.keyword_manager.select_config[user_id] = lexicon_name
+            self.keyword_manager.invalidate_resolved_ids()
+            # 只改内存并调度防抖写盘，连续切换合并为一次写
+            self.keyword_manager.schedule_select_save()
+            await event.send(event.plain_result(f"已切换到词库: {lexicon_name}"))
+        return True
 
     # 以下是命令组定义
 
@@ -1428,28 +2013,13 @@ async def keyword_main(self, event: AstrMessageEvent):
         group_id = str(event.get_group_id() or "")
         user_id = str(event.get_sender_id())
         lexicon_id = self.keyword_manager.get_lexicon_id(group_id, user_id)
-        
-        lexicon_path = StarTools.get_data_dir() / "lexicon" / f"{lexicon_id}.json"
-        
-        if await aos.path.exists(lexicon_path):
-            backup_dir = StarTools.get_data_dir() / "backups"
-            await aos.makedirs(backup_dir, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = backup_dir / f"{lexicon_id}_{timestamp}.json"
-            
-            try:
-                async with aiofiles.open(lexicon_path, 'r', encoding='utf-8') as src:
-                    async with aiofiles.open(backup_path, 'w', encoding='utf-8') as dst:
-                        await dst.write(await src.read())
-                
-                file_size = (await aos.stat(backup_path)).st_size
-                yield event.plain_result(f"✅ 备份成功！\n文件名: {backup_path.name}\n大小: {file_size} 字节")
-            except Exception as e:
-                logger.error(f"备份词库失败: {e}")
-                yield event.plain_result("❌ 备份失败，请查看日志")
+
+        ok, msg, backup_path = await self._do_backup(lexicon_id)
+        if ok:
+            file_size = (await aos.stat(backup_path)).st_size
+            yield event.plain_result(f"✅ 备份成功！\n文件名: {backup_path.name}\n大小: {file_size} 字节")
         else:
-            yield event.plain_result("❌ 词库文件不存在")
+            yield event.plain_result(f"❌ {msg}")
 
     @keyword_group.command("search")
     async def keyword_search(self, event: AstrMessageEvent, keyword: str):
@@ -1481,17 +2051,7 @@ async def keyword_main(self, event: AstrMessageEvent):
     @keyword_group.command("builtin list")
     async def keyword_builtin_list(self, event: AstrMessageEvent):
         """列出内置关键词"""
-        builtin_items = []
-        for i, item in enumerate(self.keyword_manager.builtin_keywords, 1):
-            builtin_items.append(
-                f"{i}. 【{item['keyword']}】\n"
-                f"   模式: {'模糊' if item['mode'] == 0 else '精确'}\n"
-                f"   描述: {item['description']}\n"
-                f"   回复数: {len(item['responses'])}\n"
-            )
-        
-        result = "🌟 内置关键词列表 🌟\n\n" + "\n".join(builtin_items)
-        yield event.plain_result(result)
+        yield event.plain_result(self.keyword_manager.builtin_summary())
 
     @keyword_group.command("builtin import")
     @filter.permission_type(filter.PermissionType.ADMIN)
@@ -1510,26 +2070,21 @@ async def keyword_main(self, event: AstrMessageEvent):
         target_data = await self.keyword_manager.get_lexicon(lexicon_id, "")
         imported_count = 0
         
-        # 导入内置关键词
+        # 导入内置关键词（存在性检查走变更索引，O(1)每条）
+        by_key = self.keyword_manager._get_by_key(lexicon_id, target_data)
         for item in self.keyword_manager.builtin_keywords:
             keyword = item["keyword"]
-            
-            # 检查是否已存在
-            exists = False
-            for existing_item in target_data["work"]:
-                if keyword in existing_item:
-                    exists = True
-                    break
-            
-            if not exists:
-                new_item = {
-                    keyword: {
-                        "r": item["responses"],
-                        "s": item["mode"]
-                    }
-                }
-                target_data["work"].append(new_item)
-                imported_count += 1
+
+            if keyword in by_key:
+                continue
+
+            new_value = {
+                "r": item["responses"],
+                "s": item["mode"]
+            }
+            target_data["work"].append({keyword: new_value})
+            by_key[keyword] = (len(target_data["work"]) - 1, new_value)
+            imported_count += 1
         
         # 保存词库
         await self.keyword_manager.save_lexicon(lexicon_id, target_data)
@@ -1541,4 +2096,6 @@ async def keyword_main(self, event: AstrMessageEvent):
         )
 
     async def terminate(self):
-        logger.info("Van词库插件正在卸载...")
\ No newline at end of file
+        logger.info("Van词库插件正在卸载...")
+        if self.keyword_manager:
+            await self.keyword_manager.flush_all()
\ No newline at end of file